@@ -1,15 +1,16 @@
-from flask import Flask, render_template, redirect, url_for, session, request, send_file
+from flask import Flask, render_template, redirect, url_for, session, request, send_file, jsonify
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
-import os, io, PyPDF2, json, re, uuid
+import os, io, PyPDF2, json, re, uuid, hashlib, time, zlib, threading
 from docx import Document
 from groq import Groq
 import pandas as pd
 from fpdf import FPDF
 from datetime import datetime
 from dotenv import load_dotenv
+import ocr_worker
 
 load_dotenv()
 
@@ -92,59 +93,324 @@ elif not FOLDER_ID:
 # Initialize Groq client
 groq_client = Groq(api_key=GROQ_API_KEY)
 
-def extract_text_from_pdf(file_content):
-    """Extract text from PDF file"""
+# OCR fallback configuration (scanned / image-only PDF pages)
+OCR_ENABLED = os.getenv('OCR_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+OCR_MIN_CHARS_PER_PAGE = int(os.getenv('OCR_MIN_CHARS_PER_PAGE', '50'))
+OCR_MAX_PAGES = int(os.getenv('OCR_MAX_PAGES', '20'))
+OCR_MAX_WORKERS = int(os.getenv('OCR_MAX_WORKERS', str(max(1, min(2, os.cpu_count() or 1)))))
+OCR_PAGE_TIMEOUT = int(os.getenv('OCR_PAGE_TIMEOUT', '60'))
+
+if OCR_ENABLED and not ocr_worker.OCR_AVAILABLE:
+    print("⚠️  WARNING: pytesseract/Pillow not installed. OCR fallback for scanned PDFs is disabled.")
+    OCR_ENABLED = False
+elif OCR_ENABLED and not ocr_worker.tesseract_installed():
+    print("⚠️  WARNING: Tesseract binary not found. OCR fallback for scanned PDFs is disabled.")
+    OCR_ENABLED = False
+
+# OCR output cached by page hash (keeps only the most recent entries)
+OCR_CACHE = {}
+OCR_CACHE_MAX_ENTRIES = 1000
+OCR_CACHE_LOCK = threading.Lock()
+
+def ocr_sparse_pages(pages, page_texts):
+    """Replace the text of near-empty pages with OCR output from their embedded images"""
+    sparse = [i for i, text in enumerate(page_texts) if len(text.strip()) < OCR_MIN_CHARS_PER_PAGE]
+    if not sparse:
+        return page_texts
+    
+    page_texts = list(page_texts)
+    pending = {}
+    for i in sparse[:OCR_MAX_PAGES]:
+        try:
+            image_blobs = [image.data for image in pages[i].images]
+        except Exception as e:
+            # e.g. 1-bit FlateDecode or JBIG2 scans that PyPDF2 cannot export
+            print(f"OCR skipped for page {i + 1}: could not read its images: {type(e).__name__}: {str(e)}")
+            continue
+        if not image_blobs:
+            continue
+        
+        page_hash = hashlib.sha256(b"".join(image_blobs)).hexdigest()
+        with OCR_CACHE_LOCK:
+            ocr_text = OCR_CACHE.get(page_hash)
+        if ocr_text is not None:
+            if len(ocr_text) > len(page_texts[i].strip()):
+                page_texts[i] = ocr_text
+            continue
+        pending[i] = (page_hash, ocr_worker.submit_page(image_blobs, OCR_PAGE_TIMEOUT, OCR_MAX_WORKERS))
+    
+    # Pages run OCR_MAX_WORKERS at a time and each enforces its own budget,
+    # so the whole batch should be done within this many page timeouts
+    rounds = -(-len(pending) // OCR_MAX_WORKERS)
+    batch_deadline = time.monotonic() + rounds * OCR_PAGE_TIMEOUT + OCR_PAGE_TIMEOUT / 2
+    for i, (page_hash, future) in pending.items():
+        try:
+            ocr_text = future.result(timeout=max(0, batch_deadline - time.monotonic()))
+        except Exception as e:
+            # Drop queued work so it doesn't hold up the pool for later requests
+            future.cancel()
+            print(f"OCR failed for page {i + 1}: {type(e).__name__}: {str(e)}")
+            continue
+        if not ocr_text:
+            continue
+        with OCR_CACHE_LOCK:
+            OCR_CACHE[page_hash] = ocr_text
+            
+            # Clean up old OCR results
+            if len(OCR_CACHE) > OCR_CACHE_MAX_ENTRIES:
+                for key in list(OCR_CACHE.keys())[:-OCR_CACHE_MAX_ENTRIES]:
+                    del OCR_CACHE[key]
+        if len(ocr_text) > len(page_texts[i].strip()):
+            page_texts[i] = ocr_text
+    
+    return page_texts
+
+# Historical throughput used by the dry-run cost estimator
+THROUGHPUT_STATS_FILE = "throughput_stats.json"
+MAX_SUMMARY_INPUT_CHARS = 10000
+PROMPT_OVERHEAD_CHARS = 200
+CHARS_PER_TOKEN = 4
+
+# Defaults used until real runs have been recorded
+DEFAULT_THROUGHPUT = {
+    'download_bytes_per_sec': 5 * 1024 * 1024,
+    'download_seconds_per_file': 0.3,
+    'extract_bytes_per_sec': {'pdf': 2 * 1024 * 1024, 'docx': 5 * 1024 * 1024, 'txt': 50 * 1024 * 1024},
+    'chars_per_byte': {'pdf': 0.1, 'docx': 0.3, 'txt': 1.0},
+    'summarize_seconds_per_file': 1.5,
+    'summary_chars_per_file': 1200,
+}
+
+# Shape of the recorded totals; the extract section holds one entry per file type
+# (download also keeps sums of squares/products to fit per-file overhead + bytes/sec)
+EMPTY_DOWNLOAD_STATS = {'files': 0, 'bytes': 0, 'seconds': 0.0, 'bytes_sq': 0.0, 'bytes_seconds': 0.0}
+EMPTY_EXTRACT_STATS = {'bytes': 0, 'seconds': 0.0, 'chars': 0}
+EMPTY_SUMMARIZE_STATS = {'files': 0, 'seconds': 0.0, 'output_chars': 0}
+
+def merge_counters(defaults, loaded):
+    """Take the known, non-negative numeric counters from loaded and defaults for the rest"""
+    merged = dict(defaults)
+    for key in defaults:
+        value = loaded.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+            merged[key] = value
+    return merged
+
+def load_throughput_stats():
+    """Load recorded throughput totals from disk, merged over an empty set of totals"""
+    stats = {
+        'download': dict(EMPTY_DOWNLOAD_STATS),
+        'extract': {},
+        'summarize': dict(EMPTY_SUMMARIZE_STATS),
+    }
+    if not os.path.exists(THROUGHPUT_STATS_FILE):
+        return stats
+    
     try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        with open(THROUGHPUT_STATS_FILE, "r") as f:
+            loaded = json.load(f)
     except Exception as e:
-        return f"Error extracting PDF: {str(e)}"
+        print(f"⚠️  WARNING: Could not read {THROUGHPUT_STATS_FILE}: {str(e)}")
+        return stats
+    
+    sections = [loaded.get(key) if isinstance(loaded, dict) else None
+                for key in ('download', 'extract', 'summarize')]
+    if not all(isinstance(section, dict) for section in sections):
+        print(f"⚠️  WARNING: {THROUGHPUT_STATS_FILE} is incomplete or in an old format; "
+              "missing throughput history falls back to defaults")
+    
+    download, extract, summarize = (section if isinstance(section, dict) else {} for section in sections)
+    stats['download'] = merge_counters(EMPTY_DOWNLOAD_STATS, download)
+    stats['summarize'] = merge_counters(EMPTY_SUMMARIZE_STATS, summarize)
+    for file_type, counters in extract.items():
+        if isinstance(counters, dict):
+            stats['extract'][file_type] = merge_counters(EMPTY_EXTRACT_STATS, counters)
+    return stats
 
-def extract_text_from_docx(file_content):
-    """Extract text from DOCX file"""
+def save_throughput_stats():
+    """Persist recorded throughput totals so estimates survive restarts"""
+    # Write to a temp file and swap it in so a failed write never leaves invalid JSON behind
+    tmp_file = f"{THROUGHPUT_STATS_FILE}.{os.getpid()}.tmp"
     try:
-        doc = Document(io.BytesIO(file_content))
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
+        with THROUGHPUT_STATS_LOCK:
+            with open(tmp_file, "w") as f:
+                json.dump(THROUGHPUT_STATS, f)
+            os.replace(tmp_file, THROUGHPUT_STATS_FILE)
     except Exception as e:
-        return f"Error extracting DOCX: {str(e)}"
+        print(f"⚠️  WARNING: Could not write {THROUGHPUT_STATS_FILE}: {str(e)}")
+
+THROUGHPUT_STATS = load_throughput_stats()
+THROUGHPUT_STATS_LOCK = threading.Lock()
+
+def record_throughput(file_type, size, download_seconds, extract_seconds, text_chars,
+                      summarize_seconds=None, summary_chars=0):
+    """Add the timings of one processed document to the running totals"""
+    with THROUGHPUT_STATS_LOCK:
+        download = THROUGHPUT_STATS['download']
+        download['files'] += 1
+        download['bytes'] += size
+        download['seconds'] += download_seconds
+        download['bytes_sq'] += float(size) ** 2
+        download['bytes_seconds'] += size * download_seconds
+        
+        extract = THROUGHPUT_STATS['extract'].setdefault(file_type, dict(EMPTY_EXTRACT_STATS))
+        extract['bytes'] += size
+        extract['seconds'] += extract_seconds
+        extract['chars'] += text_chars
+        
+        if summarize_seconds is not None:
+            THROUGHPUT_STATS['summarize']['files'] += 1
+            THROUGHPUT_STATS['summarize']['seconds'] += summarize_seconds
+            THROUGHPUT_STATS['summarize']['output_chars'] += summary_chars
+
+def fit_download_rate(download):
+    """
+    Fit download time as per-file overhead + size / bytes-per-sec
+    (least squares over recorded files). Returns (overhead, bytes_per_sec).
+    """
+    n = download['files']
+    mean_bytes = download['bytes'] / n
+    mean_seconds = download['seconds'] / n
+    variance = download['bytes_sq'] / n - mean_bytes ** 2
+    covariance = download['bytes_seconds'] / n - mean_bytes * mean_seconds
+    
+    if n >= 2 and variance > 1e-9 * mean_bytes ** 2 and covariance > 0:
+        seconds_per_byte = covariance / variance
+        overhead = mean_seconds - seconds_per_byte * mean_bytes
+        if overhead >= 0:
+            return overhead, 1 / seconds_per_byte
+        if mean_bytes > 0:
+            return 0.0, mean_bytes / mean_seconds
+    
+    # Too little spread in file sizes to separate the two: keep the default
+    # bytes/sec and put the rest of the mean time down to per-file overhead
+    bytes_per_sec = DEFAULT_THROUGHPUT['download_bytes_per_sec']
+    return max(0.0, mean_seconds - mean_bytes / bytes_per_sec), bytes_per_sec
+
+def get_throughput_rates():
+    """Turn recorded totals into rates, falling back to defaults where there is no history"""
+    rates = {
+        'download_bytes_per_sec': DEFAULT_THROUGHPUT['download_bytes_per_sec'],
+        'download_seconds_per_file': DEFAULT_THROUGHPUT['download_seconds_per_file'],
+        'extract_bytes_per_sec': dict(DEFAULT_THROUGHPUT['extract_bytes_per_sec']),
+        'chars_per_byte': dict(DEFAULT_THROUGHPUT['chars_per_byte']),
+        'summarize_seconds_per_file': DEFAULT_THROUGHPUT['summarize_seconds_per_file'],
+        'summary_chars_per_file': DEFAULT_THROUGHPUT['summary_chars_per_file'],
+        'historical': False,
+    }
+    
+    with THROUGHPUT_STATS_LOCK:
+        download = THROUGHPUT_STATS['download']
+        if download['files'] and download['seconds'] > 0:
+            rates['download_seconds_per_file'], rates['download_bytes_per_sec'] = fit_download_rate(download)
+            rates['historical'] = True
+        
+        for file_type, extract in THROUGHPUT_STATS['extract'].items():
+            if extract['bytes'] and extract['seconds'] > 0:
+                rates['extract_bytes_per_sec'][file_type] = extract['bytes'] / extract['seconds']
+            if extract['bytes']:
+                rates['chars_per_byte'][file_type] = extract['chars'] / extract['bytes']
+        
+        summarize = THROUGHPUT_STATS['summarize']
+        if summarize['files']:
+            rates['summarize_seconds_per_file'] = summarize['seconds'] / summarize['files']
+            rates['summary_chars_per_file'] = summarize['output_chars'] / summarize['files']
+    
+    return rates
+
+def estimate_folder_cost(files):
+    """Estimate download bytes, extraction time, Groq tokens and wall-clock time from metadata only"""
+    rates = get_throughput_rates()
+    estimates = []
+    totals = {'files': 0, 'download_bytes': 0, 'extract_seconds': 0.0, 'input_tokens': 0,
+              'output_tokens': 0, 'total_tokens': 0, 'wall_clock_seconds': 0.0}
+    
+    for file in files:
+        file_type = get_file_type(file['mimeType'])
+        size = int(file.get('size', 0))
+        
+        download_seconds = rates['download_seconds_per_file'] + size / rates['download_bytes_per_sec']
+        extract_seconds = size / rates['extract_bytes_per_sec'][file_type]
+        text_chars = int(size * rates['chars_per_byte'][file_type])
+        
+        # summarize_text truncates its input, so large files cost the same number of tokens
+        if text_chars:
+            input_chars = min(text_chars, MAX_SUMMARY_INPUT_CHARS) + PROMPT_OVERHEAD_CHARS
+            input_tokens = input_chars // CHARS_PER_TOKEN
+            output_tokens = int(rates['summary_chars_per_file'] // CHARS_PER_TOKEN)
+            summarize_seconds = rates['summarize_seconds_per_file']
+        else:
+            input_tokens = output_tokens = 0
+            summarize_seconds = 0.0
+        
+        wall_clock_seconds = download_seconds + extract_seconds + summarize_seconds
+        estimates.append({
+            'file_name': file['name'],
+            'file_id': file['id'],
+            'file_type': file_type,
+            'md5_checksum': file.get('md5Checksum'),
+            'download_bytes': size,
+            'extract_seconds': round(extract_seconds, 3),
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'wall_clock_seconds': round(wall_clock_seconds, 3),
+        })
+        
+        totals['files'] += 1
+        totals['download_bytes'] += size
+        totals['extract_seconds'] += extract_seconds
+        totals['input_tokens'] += input_tokens
+        totals['output_tokens'] += output_tokens
+        totals['total_tokens'] += input_tokens + output_tokens
+        totals['wall_clock_seconds'] += wall_clock_seconds
+    
+    totals['extract_seconds'] = round(totals['extract_seconds'], 3)
+    totals['wall_clock_seconds'] = round(totals['wall_clock_seconds'], 3)
+    return {'totals': totals, 'files': estimates, 'historical_throughput': rates['historical']}
+
+def extract_text_from_pdf(file_content):
+    """Extract text from PDF file, falling back to OCR for scanned pages (raises on failure)"""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    page_texts = [page.extract_text() or "" for page in pdf_reader.pages]
+    
+    # Only pages below the text density threshold are sent to OCR
+    if OCR_ENABLED:
+        page_texts = ocr_sparse_pages(pdf_reader.pages, page_texts)
+    
+    return "\n".join(page_texts).strip()
+
+def extract_text_from_docx(file_content):
+    """Extract text from DOCX file (raises on failure)"""
+    doc = Document(io.BytesIO(file_content))
+    text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    return text.strip()
 
 def extract_text_from_txt(file_content):
-    """Extract text from TXT file"""
-    try:
-        return file_content.decode('utf-8').strip()
-    except Exception as e:
-        return f"Error extracting TXT: {str(e)}"
+    """Extract text from TXT file (raises on failure)"""
+    return file_content.decode('utf-8').strip()
 
 def summarize_text(text, filename):
-    """Summarize text using Groq AI"""
-    try:
-        # Truncate text if too long (Groq has token limits)
-        max_chars = 10000
-        if len(text) > max_chars:
-            text = text[:max_chars] + "..."
-        
-        chat_completion = groq_client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a document summarization assistant. Provide concise summaries in 5-10 sentences highlighting the key points."
-                },
-                {
-                    "role": "user",
-                    "content": f"Summarize the following document '{filename}':\n\n{text}"
-                }
-            ],
-            model="llama-3.1-8b-instant",
-            temperature=0.3,
-            max_tokens=500
-        )
-        return chat_completion.choices[0].message.content
-    except Exception as e:
-        return f"Error summarizing: {str(e)}"
+    """Summarize text using Groq AI (raises on failure)"""
+    # Truncate text if too long (Groq has token limits)
+    if len(text) > MAX_SUMMARY_INPUT_CHARS:
+        text = text[:MAX_SUMMARY_INPUT_CHARS] + "..."
+    
+    chat_completion = groq_client.chat.completions.create(
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a document summarization assistant. Provide concise summaries in 5-10 sentences highlighting the key points."
+            },
+            {
+                "role": "user",
+                "content": f"Summarize the following document '{filename}':\n\n{text}"
+            }
+        ],
+        model="llama-3.1-8b-instant",
+        temperature=0.3,
+        max_tokens=500
+    )
+    return chat_completion.choices[0].message.content
 
 def get_drive_service():
     """Create Google Drive service"""
@@ -163,9 +429,92 @@ def get_file_type(mime_type):
     }
     return mime_map.get(mime_type, 'unknown')
 
+# Result error codes (full error text is logged, not stored per result)
+ERROR_UNSUPPORTED = 'unsupported'
+ERROR_EXTRACT = 'extract_failed'
+ERROR_SUMMARIZE = 'summarize_failed'
+ERROR_PROCESS = 'process_failed'
+
+ERROR_MESSAGES = {
+    ERROR_UNSUPPORTED: "Unsupported file type",
+    ERROR_EXTRACT: "Error extracting text from document",
+    ERROR_SUMMARIZE: "Error summarizing document",
+    ERROR_PROCESS: "Error processing file",
+}
+
+# Summaries at least this long are stored zlib-compressed
+COMPRESS_SUMMARIES = os.getenv('COMPRESS_SUMMARIES', 'true').lower() in ('1', 'true', 'yes')
+COMPRESS_MIN_CHARS = 256
+
+class ResultRecord:
+    """
+    Compact result of processing one document, as held in TEMP_RESULTS.
+    
+    The file URL and formatted timestamp are derived on access, the
+    timestamp is stored as epoch seconds, errors are stored as one of the
+    ERROR_* codes and long summaries are stored compressed.
+    """
+    __slots__ = ('file_name', 'file_id', 'file_type', 'timestamp', 'error_code', '_summary')
+    
+    def __init__(self, file_name, file_id, file_type, summary='', error_code=None, timestamp=None):
+        self.file_name = file_name
+        self.file_id = file_id
+        self.file_type = file_type
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+        self.error_code = error_code
+        if COMPRESS_SUMMARIES and len(summary) >= COMPRESS_MIN_CHARS:
+            summary = zlib.compress(summary.encode('utf-8'))
+        self._summary = summary
+    
+    @property
+    def file_url(self):
+        return f'https://drive.google.com/file/d/{self.file_id}/view'
+    
+    @property
+    def summary(self):
+        if self.error_code:
+            return ERROR_MESSAGES[self.error_code]
+        if isinstance(self._summary, bytes):
+            return zlib.decompress(self._summary).decode('utf-8')
+        return self._summary
+    
+    @property
+    def processed_at(self):
+        return datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+    
+    def to_dict(self):
+        """Expanded form used for exports"""
+        return {
+            'file_name': self.file_name,
+            'file_id': self.file_id,
+            'file_type': self.file_type,
+            'file_url': self.file_url,
+            'summary': self.summary,
+            'error_code': self.error_code,
+            'processed_at': self.processed_at
+        }
+
+def list_folder_files(service, fields="files(id, name, mimeType, webViewLink)"):
+    """List the files /process would work on"""
+    if FOLDER_ID:
+        query = f"'{FOLDER_ID}' in parents and trashed=false"
+    else:
+        # If no folder ID, list recent files
+        query = "trashed=false"
+    
+    results = service.files().list(
+        q=query,
+        fields=fields,
+        pageSize=20,
+        orderBy="modifiedTime desc"
+    ).execute()
+    
+    return results.get('files', [])
+
 def process_document(service, file_id, file_name, mime_type):
     """Download and process a single document"""
     try:
+        download_start = time.perf_counter()
         request_obj = service.files().get_media(fileId=file_id)
         file_content = io.BytesIO()
         downloader = MediaIoBaseDownload(file_content, request_obj)
@@ -176,40 +525,43 @@ def process_document(service, file_id, file_name, mime_type):
         
         file_content.seek(0)
         content = file_content.read()
+        download_seconds = time.perf_counter() - download_start
         
         # Extract text based on file type
-        if mime_type == 'application/pdf':
-            text = extract_text_from_pdf(content)
-        elif mime_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
-            text = extract_text_from_docx(content)
-        elif mime_type == 'text/plain':
-            text = extract_text_from_txt(content)
-        else:
-            text = "Unsupported file type"
+        file_type = get_file_type(mime_type)
+        extract_start = time.perf_counter()
+        try:
+            if mime_type == 'application/pdf':
+                text = extract_text_from_pdf(content)
+            elif mime_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
+                text = extract_text_from_docx(content)
+            elif mime_type == 'text/plain':
+                text = extract_text_from_txt(content)
+            else:
+                return ResultRecord(file_name, file_id, file_type, error_code=ERROR_UNSUPPORTED)
+        except Exception as e:
+            print(f"Error extracting {file_type.upper()} {file_name}: {str(e)}")
+            return ResultRecord(file_name, file_id, file_type, error_code=ERROR_EXTRACT)
+        extract_seconds = time.perf_counter() - extract_start
+        
+        if not text:
+            return ResultRecord(file_name, file_id, file_type)
         
         # Summarize
-        if text and not text.startswith("Error") and text != "Unsupported file type":
+        summarize_start = time.perf_counter()
+        try:
             summary = summarize_text(text, file_name)
-        else:
-            summary = text
+        except Exception as e:
+            print(f"Error summarizing {file_name}: {str(e)}")
+            return ResultRecord(file_name, file_id, file_type, error_code=ERROR_SUMMARIZE)
+        summarize_seconds = time.perf_counter() - summarize_start
         
-        return {
-            'file_name': file_name,
-            'file_id': file_id,
-            'file_type': get_file_type(mime_type),
-            'file_url': f'https://drive.google.com/file/d/{file_id}/view',
-            'summary': summary,
-            'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        record_throughput(file_type, len(content), download_seconds,
+                          extract_seconds, len(text), summarize_seconds, len(summary))
+        return ResultRecord(file_name, file_id, file_type, summary)
     except Exception as e:
-        return {
-            'file_name': file_name,
-            'file_id': file_id,
-            'file_type': get_file_type(mime_type),
-            'file_url': f'https://drive.google.com/file/d/{file_id}/view',
-            'summary': f"Error processing file: {str(e)}",
-            'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        print(f"Error processing file {file_name}: {str(e)}")
+        return ResultRecord(file_name, file_id, get_file_type(mime_type), error_code=ERROR_PROCESS)
 
 @app.route('/')
 def index():
@@ -275,7 +627,7 @@ def oauth2callback():
 
 @app.route('/process')
 def process():
-    """Process documents from Google Drive"""
+    """Process documents from Google Drive (or estimate the cost with ?dry_run=1)"""
     if 'credentials' not in session:
         return redirect(url_for('authorize'))
     
@@ -283,23 +635,11 @@ def process():
     if not service:
         return redirect(url_for('authorize'))
     
+    if request.args.get('dry_run', '').lower() in ('1', 'true', 'yes'):
+        return dry_run_estimate(service)
+    
     try:
-        # Build query
-        if FOLDER_ID:
-            query = f"'{FOLDER_ID}' in parents and trashed=false"
-        else:
-            # If no folder ID, list recent files
-            query = "trashed=false"
-        
-        # List files
-        results = service.files().list(
-            q=query,
-            fields="files(id, name, mimeType, webViewLink)",
-            pageSize=20,
-            orderBy="modifiedTime desc"
-        ).execute()
-        
-        files = results.get('files', [])
+        files = list_folder_files(service)
         
         if not files:
             # Store empty result with unique ID
@@ -322,6 +662,8 @@ def process():
                 result = process_document(service, file['id'], file['name'], file['mimeType'])
                 summaries.append(result)
         
+        save_throughput_stats()
+        
         # Store summaries server-side with unique ID (avoids cookie size limit)
         session_id = str(uuid.uuid4())
         TEMP_RESULTS[session_id] = summaries
@@ -624,6 +966,21 @@ def process():
             </html>
             """
 
+def dry_run_estimate(service):
+    """Dry run: estimate the cost of /process from file metadata without downloading anything"""
+    start = time.perf_counter()
+    try:
+        files = list_folder_files(service, fields="files(id, name, mimeType, size, md5Checksum)")
+        supported_files = [file for file in files if get_file_type(file['mimeType']) != 'unknown']
+        
+        result = estimate_folder_cost(supported_files)
+        result['folder_id'] = FOLDER_ID
+        result['skipped_unsupported'] = len(files) - len(supported_files)
+        result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/results')
 def results():
     """Display results"""
@@ -656,7 +1013,7 @@ def export_csv():
     if not summaries:
         return redirect(url_for('index'))
     
-    df = pd.DataFrame(summaries)
+    df = pd.DataFrame([summary.to_dict() for summary in summaries])
     
     csv_buffer = io.StringIO()
     df.to_csv(csv_buffer, index=False)
@@ -691,15 +1048,15 @@ def export_pdf():
     for idx, summary in enumerate(summaries, 1):
         pdf.set_font("Arial", 'B', 12)
         # Handle unicode characters
-        safe_filename = summary['file_name'].encode('latin-1', 'replace').decode('latin-1')
+        safe_filename = summary.file_name.encode('latin-1', 'replace').decode('latin-1')
         pdf.cell(0, 10, f"{idx}. {safe_filename}", 0, 1)
         
         pdf.set_font("Arial", '', 10)
-        pdf.multi_cell(0, 5, f"Type: {summary.get('file_type', 'N/A').upper()}")
-        pdf.multi_cell(0, 5, f"Processed: {summary['processed_at']}")
+        pdf.multi_cell(0, 5, f"Type: {(summary.file_type or 'N/A').upper()}")
+        pdf.multi_cell(0, 5, f"Processed: {summary.processed_at}")
         
         # Handle unicode in summary
-        safe_summary = summary['summary'].encode('latin-1', 'replace').decode('latin-1')
+        safe_summary = summary.summary.encode('latin-1', 'replace').decode('latin-1')
         pdf.multi_cell(0, 5, f"Summary: {safe_summary}")
         pdf.ln(5)
     
@@ -0,0 +1,420 @@
+"""
+Load and soak test harness for the Flask routes.
+
+Drives the real app (/process, /results, /export/csv, /export/pdf) with
+stubbed Google Drive and Groq clients at a configurable concurrency and
+duration, then reports throughput, latency percentiles and error rates
+per route, plus process RSS growth and the retained size of TEMP_RESULTS.
+
+Each virtual user is dedicated to one route, so every route's throughput
+is measured on its own. Users of /results and /export/* read a
+pre-seeded TEMP_RESULTS entry; --mix sets how many users each route gets.
+
+Usage:
+    python loadtest.py --concurrency 8 --duration 60
+    python loadtest.py --concurrency 8 --mix "/process=1,/results=4,/export/csv=2,/export/pdf=1"
+    python loadtest.py --duration 600 --save-baseline loadtest_baseline.json
+    python loadtest.py --baseline loadtest_baseline.json   # exits 1 on regression
+"""
+import argparse, json, math, os, sys, tempfile, threading, time
+from types import SimpleNamespace
+
+EXPECTED_STATUS = {'/process': 302, '/results': 200, '/export/csv': 200, '/export/pdf': 200}
+DEFAULT_MIX = '/process=1,/results=1,/export/csv=1,/export/pdf=1'
+SEED_RESULT_ID = 'loadtest-seed'
+
+# Run settings recorded in report['config'] (argument name -> config key) and their defaults
+RUN_SETTINGS = {
+    'concurrency': ('concurrency', 4),
+    'duration': ('duration_s', 30),
+    'files': ('files', 10),
+    'groq_latency': ('groq_latency_s', 0.05),
+    'drive_latency': ('drive_latency_s', 0.01),
+    'mix': ('mix', DEFAULT_MIX),
+}
+
+SAMPLE_TEXT = (
+    "Quarterly report. Revenue grew in all regions while operating costs stayed flat. "
+    "The team shipped three major releases and reduced support tickets by a third.\n"
+) * 40
+
+def load_app():
+    """Import app.py with a dummy credentials file and API key so no real secrets are needed"""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, repo_dir)
+
+    work_dir = tempfile.mkdtemp(prefix='loadtest_')
+    with open(os.path.join(work_dir, 'credentials.json'), 'w') as f:
+        json.dump({'web': {'client_id': 'loadtest', 'client_secret': 'loadtest'}}, f)
+    os.environ.setdefault('GROQ_API_KEY', 'loadtest')
+    os.environ.setdefault('OCR_ENABLED', 'false')
+
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        import app as app_module
+    finally:
+        os.chdir(cwd)
+    return app_module
+
+class FakeRequest:
+    """Stands in for an HttpRequest returned by files().list() / files().get_media()"""
+    def __init__(self, payload, latency):
+        self.payload = payload
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return self.payload
+
+class FakeFiles:
+    def __init__(self, files, latency):
+        self.files = files
+        self.latency = latency
+
+    def list(self, **kwargs):
+        return FakeRequest({'files': self.files}, self.latency)
+
+    def get_media(self, fileId):
+        return FakeRequest(SAMPLE_TEXT.encode('utf-8'), self.latency)
+
+class FakeDriveService:
+    def __init__(self, num_files, latency):
+        self._files = FakeFiles([
+            {'id': f'loadtest-file-{i}', 'name': f'document_{i}.txt', 'mimeType': 'text/plain'}
+            for i in range(num_files)
+        ], latency)
+
+    def files(self):
+        return self._files
+
+class FakeDownloader:
+    """Replacement for MediaIoBaseDownload that writes the fake payload in one chunk"""
+    def __init__(self, fd, request_obj):
+        self.fd = fd
+        self.request_obj = request_obj
+
+    def next_chunk(self):
+        self.fd.write(self.request_obj.execute())
+        return None, True
+
+class FakeGroqClient:
+    """Mimics groq_client.chat.completions.create with a fixed latency"""
+    def __init__(self, latency):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.latency = latency
+
+    def create(self, messages, **kwargs):
+        time.sleep(self.latency)
+        content = "Stub summary of " + messages[-1]['content'][:80]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def install_stubs(app_module, args):
+    """Point the app at the fake Drive and Groq clients"""
+    service = FakeDriveService(args.files, args.drive_latency)
+    app_module.get_drive_service = lambda: service
+    app_module.MediaIoBaseDownload = FakeDownloader
+    app_module.groq_client = FakeGroqClient(args.groq_latency)
+    # Keep recorded throughput from stub runs out of the real stats file
+    app_module.THROUGHPUT_STATS_FILE = os.path.join(tempfile.mkdtemp(prefix='loadtest_'), 'throughput_stats.json')
+
+def parse_mix(mix):
+    """Parse '/process=1,/results=4,...' into {route: weight}"""
+    weights = {}
+    for part in mix.split(','):
+        route, _, weight = part.strip().partition('=')
+        if route not in EXPECTED_STATUS:
+            raise ValueError(f"Unknown route in --mix: {route}")
+        weights[route] = float(weight or 1)
+    return {route: weight for route, weight in weights.items() if weight > 0}
+
+def assign_users(weights, concurrency):
+    """Split the virtual users across routes by weight (largest remainder, at least one each)"""
+    if concurrency < len(weights):
+        raise ValueError(f"--concurrency must be at least {len(weights)} for this --mix")
+    total = sum(weights.values())
+    shares = {route: 1 + (concurrency - len(weights)) * weight / total for route, weight in weights.items()}
+    users = {route: int(share) for route, share in shares.items()}
+    leftover = concurrency - sum(users.values())
+    for route in sorted(shares, key=lambda r: shares[r] - users[r], reverse=True)[:leftover]:
+        users[route] += 1
+    return users
+
+def seed_results(app_module):
+    """Build the TEMP_RESULTS entry read by /results and /export/* users"""
+    service = app_module.get_drive_service()
+    return [
+        app_module.process_document(service, file['id'], file['name'], file['mimeType'])
+        for file in service.files().list().execute()['files']
+    ]
+
+# Latencies go into log-scale buckets (2% wide) so the harness itself uses constant memory
+HISTOGRAM_MIN_MS = 0.01
+HISTOGRAM_GROWTH = 1.02
+HISTOGRAM_BUCKETS = 1100  # covers up to ~50 minutes
+
+class LatencyHistogram:
+    """Streaming latency histogram with approximate percentiles"""
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.total = 0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        index = 0
+        if ms > HISTOGRAM_MIN_MS:
+            index = min(HISTOGRAM_BUCKETS - 1, int(math.log(ms / HISTOGRAM_MIN_MS, HISTOGRAM_GROWTH)) + 1)
+        self.counts[index] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct):
+        """Upper edge of the bucket holding the nearest-rank percentile"""
+        if not self.total:
+            return 0.0
+        rank = max(1, int(round(pct / 100 * self.total)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.max_ms, HISTOGRAM_MIN_MS * HISTOGRAM_GROWTH ** index)
+        return self.max_ms
+
+def current_rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is not available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+def deep_sizeof(obj, seen=None):
+    """Approximate retained size of containers, strings and slotted/plain objects"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif not isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        for slot in getattr(type(obj), '__slots__', ()):
+            size += deep_sizeof(getattr(obj, slot, None), seen)
+        if hasattr(obj, '__dict__'):
+            size += deep_sizeof(obj.__dict__, seen)
+    return size
+
+def run_user(app_module, route, seed, deadline, stats, lock):
+    """One virtual user: request a single route in a loop until the deadline"""
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess['credentials'] = {'token': 'loadtest'}
+        if route != '/process':
+            sess['result_id'] = SEED_RESULT_ID
+
+    while time.time() < deadline:
+        # /process users evict old entries, so put the seed back (untimed) if needed
+        if route != '/process' and SEED_RESULT_ID not in app_module.TEMP_RESULTS:
+            app_module.TEMP_RESULTS[SEED_RESULT_ID] = seed
+
+        start = time.perf_counter()
+        try:
+            response = client.get(route)
+            ok = response.status_code == EXPECTED_STATUS[route]
+            response.close()
+        except Exception:
+            ok = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with lock:
+            stats[route]['latencies'].add(elapsed_ms)
+            # Throughput only counts requests finished inside the test window
+            if time.time() <= deadline:
+                stats[route]['completed'] += 1
+            if not ok:
+                stats[route]['errors'] += 1
+
+def run(args, users):
+    app_module = load_app()
+    install_stubs(app_module, args)
+    app_module.app.config['TESTING'] = True
+    seed = seed_results(app_module)
+
+    stats = {route: {'latencies': LatencyHistogram(), 'completed': 0, 'errors': 0} for route in users}
+    lock = threading.Lock()
+    memory_samples = []
+
+    start_rss = current_rss_bytes()
+    start = time.time()
+    deadline = start + args.duration
+
+    threads = [
+        threading.Thread(target=run_user, args=(app_module, route, seed, deadline, stats, lock), daemon=True)
+        for route, count in users.items()
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+
+    # Sample RSS while the test runs (cheap, so it doesn't skew the timings)
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(min(args.sample_interval, max(0.1, deadline - time.time())))
+        memory_samples.append({
+            'elapsed_s': round(time.time() - start, 1),
+            'rss_growth_mb': round((current_rss_bytes() - start_rss) / 1024 / 1024, 2),
+            'temp_results': len(app_module.TEMP_RESULTS),
+        })
+
+    # Measured after the timed window so the walk doesn't affect throughput
+    temp_results_mb = deep_sizeof(app_module.TEMP_RESULTS) / 1024 / 1024
+
+    report = {
+        'config': {
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'files': args.files,
+            'groq_latency_s': args.groq_latency,
+            'drive_latency_s': args.drive_latency,
+            'mix': args.mix,
+            'users': users,
+        },
+        'routes': {},
+        'memory': {
+            'growth_mb': memory_samples[-1]['rss_growth_mb'] if memory_samples else 0.0,
+            'peak_mb': max((sample['rss_growth_mb'] for sample in memory_samples), default=0.0),
+            'temp_results_entries': len(app_module.TEMP_RESULTS),
+            'temp_results_mb': round(temp_results_mb, 2),
+            'samples': memory_samples,
+        },
+    }
+    for route, route_stats in stats.items():
+        latencies = route_stats['latencies']
+        count = latencies.total
+        report['routes'][route] = {
+            'requests': count,
+            # Divide by the test window, not wall time, which includes draining in-flight requests
+            'throughput_rps': round(route_stats['completed'] / args.duration, 2) if args.duration else 0.0,
+            'error_rate': round(route_stats['errors'] / count, 4) if count else 0.0,
+            'p50_ms': round(latencies.percentile(50), 2),
+            'p90_ms': round(latencies.percentile(90), 2),
+            'p99_ms': round(latencies.percentile(99), 2),
+            'max_ms': round(latencies.max_ms, 2),
+        }
+    return report
+
+def print_report(report):
+    print("=" * 84)
+    print("Load Test Results")
+    print("=" * 84)
+    config = report['config']
+    print(f"Concurrency: {config['concurrency']}  Duration: {config['duration_s']}s  "
+          f"Files/folder: {config['files']}")
+    print("-" * 84)
+    print(f"{'Route':<14}{'Users':>6}{'Requests':>10}{'RPS':>10}{'Errors':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for route, r in report['routes'].items():
+        print(f"{route:<14}{config['users'][route]:>6}{r['requests']:>10}{r['throughput_rps']:>10}{r['error_rate']:>9.2%}"
+              f"{r['p50_ms']:>10}{r['p90_ms']:>10}{r['p99_ms']:>10}")
+    print("-" * 84)
+    memory = report['memory']
+    print(f"RSS growth: {memory['growth_mb']} MB  Peak: {memory['peak_mb']} MB  "
+          f"TEMP_RESULTS: {memory['temp_results_entries']} entries, {memory['temp_results_mb']} MB")
+    print("=" * 84)
+
+def resolve_settings(args, baseline):
+    """
+    Fill run settings that were not given on the command line from the
+    baseline's config (or the defaults), and return the settings that
+    were given but differ from the baseline.
+    """
+    baseline_config = baseline.get('config', {}) if baseline else {}
+    mismatches = []
+    for name, (config_key, default) in RUN_SETTINGS.items():
+        value = getattr(args, name)
+        if value is None:
+            setattr(args, name, baseline_config.get(config_key, default))
+        elif config_key in baseline_config and value != baseline_config[config_key]:
+            mismatches.append(f"{config_key}: {value} (baseline {baseline_config[config_key]})")
+    return mismatches
+
+def compare_to_baseline(report, baseline, tolerance):
+    """Return a list of regressions where the run is worse than the baseline by more than tolerance"""
+    regressions = []
+    for route, base in baseline.get('routes', {}).items():
+        current = report['routes'].get(route)
+        if not current:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if base[metric] and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{route} {metric}: {current[metric]} > baseline {base[metric]}")
+        if base['throughput_rps'] and current['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            regressions.append(
+                f"{route} throughput_rps: {current['throughput_rps']} < baseline {base['throughput_rps']}"
+            )
+        if current['error_rate'] > base['error_rate']:
+            regressions.append(f"{route} error_rate: {current['error_rate']} > baseline {base['error_rate']}")
+
+    base_growth = baseline.get('memory', {}).get('growth_mb')
+    if base_growth is not None and report['memory']['growth_mb'] > max(base_growth, 1.0) * (1 + tolerance):
+        regressions.append(f"memory growth_mb: {report['memory']['growth_mb']} > baseline {base_growth}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Load/soak test the Drive Summarizer Flask routes")
+    # Run settings default to None so they can be taken from --baseline
+    parser.add_argument('--concurrency', type=int, help="Number of concurrent virtual users (default: 4)")
+    parser.add_argument('--duration', type=float, help="Test duration in seconds (default: 30)")
+    parser.add_argument('--files', type=int, help="Files returned by the stub Drive folder (default: 10)")
+    parser.add_argument('--groq-latency', type=float, help="Simulated Groq latency in seconds (default: 0.05)")
+    parser.add_argument('--drive-latency', type=float, help="Simulated Drive latency in seconds (default: 0.01)")
+    parser.add_argument('--mix', help="Relative number of users per route, e.g. '/process=1,/results=4' "
+                                      "(default: equal split)")
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="Memory sampling interval (s)")
+    parser.add_argument('--output', help="Write the full JSON report to this file")
+    parser.add_argument('--baseline', help="Compare against this baseline report and exit 1 on regression; "
+                                           "run settings not given default to the baseline's")
+    parser.add_argument('--save-baseline', help="Save this run as the baseline report")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed regression vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    mismatches = resolve_settings(args, baseline)
+    if mismatches:
+        print("❌ Run settings differ from the baseline, results would not be comparable:")
+        for mismatch in mismatches:
+            print(f"  - {mismatch}")
+        sys.exit(2)
+
+    try:
+        users = assign_users(parse_mix(args.mix), args.concurrency)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = run(args, users)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Baseline saved to {args.save_baseline}")
+
+    if baseline:
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("❌ Performance regressions detected:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("✓ No regressions against baseline")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+OCR for scanned PDF pages.
+
+Kept free of import side effects so it is cheap to import from app.py.
+Each image is OCR'd by its own Tesseract process (through pytesseract);
+a small thread pool only drives those processes and caps how many run
+at once, so nothing forks the threaded Flask server or re-imports app.py.
+"""
+import io, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional OCR dependencies (only needed for scanned PDFs)
+try:
+    import pytesseract
+    from PIL import Image, UnidentifiedImageError
+    OCR_AVAILABLE = True
+except ImportError:
+    OCR_AVAILABLE = False
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def tesseract_installed():
+    """Check that the Tesseract binary used by pytesseract can be run"""
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+def get_pool(max_workers):
+    """Lazily create the pool so the text-PDF path never pays for it"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # One single-threaded Tesseract per worker keeps OCR to max_workers CPUs
+            os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+            _pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ocr')
+    return _pool
+
+def ocr_page_images(image_blobs, page_timeout):
+    """
+    Run Tesseract on the images of one page within page_timeout seconds in total.
+
+    The remaining budget is split evenly across the images still to be
+    read. Only images Pillow cannot decode are skipped; Tesseract errors
+    and timeouts are raised so the caller can log them instead of caching
+    a blank page.
+    """
+    deadline = time.monotonic() + page_timeout
+    texts = []
+    for index, blob in enumerate(image_blobs):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(f"OCR page timeout after {page_timeout}s")
+        try:
+            image = Image.open(io.BytesIO(blob))
+        except (UnidentifiedImageError, OSError):
+            continue
+        image_timeout = remaining / (len(image_blobs) - index)
+        texts.append(pytesseract.image_to_string(image, timeout=image_timeout))
+    return "\n".join(text.strip() for text in texts if text.strip())
+
+def submit_page(image_blobs, page_timeout, max_workers):
+    """Queue OCR of one page and return its future"""
+    return get_pool(max_workers).submit(ocr_page_images, image_blobs, page_timeout)